@@ -6,10 +6,20 @@ This module:
 - Registers extensions
 """
 
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
 from flask import Flask
+from flask.logging import default_handler
 
 # Import extensions
 from .extensions import bcrypt, cors, db, jwt, ma, redis_client, limiter
+from . import hashing
 
 # Import config
 from config import config_by_name
@@ -19,6 +29,7 @@ def create_app(config_name):
     app = Flask(__name__)
     app.config.from_object(config_by_name[config_name])
 
+    register_logging(app)
     register_extensions(app)
 
     # Register blueprints
@@ -30,9 +41,84 @@ def create_app(config_name):
 
     app.register_blueprint(api_bp ,url_prefix="/api")
 
+    warm_email_templates(app)
+
     return app
 
 
+# Records are handed to a background listener so request threads never block on stream I/O.
+# A forked worker inherits the queue but not the listener thread, so each process starts
+# its own listener lazily, on its first record, instead of in create_app()
+_log_queue = queue.Queue(-1)
+_log_listener = None
+_log_listener_lock = threading.Lock()
+
+
+def _start_log_listener():
+    global _log_listener
+
+    with _log_listener_lock:
+        if _log_listener is None:
+            stream_handler = logging.StreamHandler(sys.stdout)
+            stream_handler.setFormatter(
+                logging.Formatter("[%(asctime)s] %(levelname)s in %(module)s: %(message)s")
+            )
+            listener = QueueListener(_log_queue, stream_handler)
+            listener.start()
+            _log_listener = listener
+
+
+def _stop_log_listener():
+    # Flush whatever is still queued when the process exits
+    global _log_listener
+
+    with _log_listener_lock:
+        if _log_listener is not None:
+            _log_listener.stop()
+            _log_listener = None
+
+
+def _reset_logging_after_fork():
+    # The parent's queue may hold records it still prints itself, and its locks may have
+    # been held by the parent's listener thread at fork time: start this child from scratch
+    global _log_queue, _log_listener, _log_listener_lock
+
+    _log_queue = queue.Queue(-1)
+    _log_listener = None
+    _log_listener_lock = threading.Lock()
+
+
+atexit.register(_stop_log_listener)
+if hasattr(os, "register_at_fork"):  # POSIX only; nothing forks elsewhere
+    os.register_at_fork(after_in_child=_reset_logging_after_fork)
+
+
+class _ProcessQueueHandler(QueueHandler):
+    """ QueueHandler feeding the current process's queue, starting its listener on demand """
+
+    def enqueue(self, record):
+        if _log_listener is None:
+            _start_log_listener()
+        _log_queue.put_nowait(record)
+
+
+def register_logging(app):
+    # app.logger is shared by name across create_app() calls, so only attach once
+    app.logger.removeHandler(default_handler)
+    if not any(isinstance(h, QueueHandler) for h in app.logger.handlers):
+        app.logger.addHandler(_ProcessQueueHandler(_log_queue))
+
+
+# HTML bodies rendered by send_email; compiled once here instead of on the first OTP/reset
+EMAIL_TEMPLATES = ("email/otp_email.html", "email/password_reset.html")
+
+
+def warm_email_templates(app):
+    # Jinja keeps compiled templates in its cache, so later render_template calls skip disk + compile
+    for template_name in EMAIL_TEMPLATES:
+        app.jinja_env.get_template(template_name)
+
+
 def register_extensions(app):
     # Registers flask extensions
     db.init_app(app)
@@ -42,3 +128,5 @@ def register_extensions(app):
     cors.init_app(app)
     redis_client.init_app(app)
     limiter.init_app(app)
+    # Password hasher parameters come from config
+    hashing.init_app(app)
@@ -17,6 +17,9 @@ def roles_required(*required_roles):
     Returns:
         Decorator function.
     """
+    # Build the allowed-role set once per decorated endpoint, not on every request
+    allowed_roles_set = frozenset(required_roles)
+
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -31,7 +34,9 @@ def roles_required(*required_roles):
                 if not user_role:
                     # This case should ideally not happen if login logic is correct
                     current_app.logger.warning(
-                        f"Role missing from JWT payload for endpoint {func.__name__}. Payload: {jwt_payload}"
+                        "Role missing from JWT payload for endpoint %s. Payload: %s",
+                        func.__name__,
+                        jwt_payload,
                     )
                     return err_resp(
                         "Authorization failed: Role information missing from token.",
@@ -40,7 +45,6 @@ def roles_required(*required_roles):
                     )
 
                 # Check if the user's role is in the allowed list for this endpoint
-                allowed_roles_set = set(required_roles)
                 if user_role not in allowed_roles_set:
                     # User is authenticated but does not have the required role
                     return err_resp(
@@ -55,7 +59,9 @@ def roles_required(*required_roles):
             except Exception as e:
                 # Catch potential errors during JWT processing, though less likely after @jwt_required
                 current_app.logger.error(
-                    f"Error during role check decorator for {func.__name__}: {e}",
+                    "Error during role check decorator for %s: %s",
+                    func.__name__,
+                    e,
                     exc_info=True
                 )
                 # Use your internal error response utility
@@ -1,5 +1,7 @@
 from flask_restx import Namespace, fields
 
+from app.utils import compiled_model
+
 class GroupDto:
     # Define the namespace for group operations
     api = Namespace("groups", description="School group related operations.")
@@ -42,18 +44,18 @@ class GroupDto:
     )
 
     # --- Add DTOs for POST/PUT if needed ---
+    # Validated on every request, so built as compiled_model (validator created once)
     # Example for creating a group (omitting read-only 'id')
-    group_create = api.model(
+    # Derived from 'group' so both models share the same field instances
+    group_create = compiled_model(
+        api,
         "Group Create Input",
-        {
-             "name": fields.String(required=True, description="Name of the group (max 50 chars)", max_length=50),
-             "level_id": fields.Integer(required=True, description="ID of the level this group belongs to"),
-             # Add other writable fields as necessary
-        }
+        {key: field for key, field in group.items() if not field.readonly},
     )
     # Example for updating a group (fields might be optional)
-    group_update = api.model(
-         "Group Update Input",
+    group_update = compiled_model(
+        api,
+        "Group Update Input",
         {
              "name": fields.String(description="New name for the group (max 50 chars)", max_length=50),
              "level_id": fields.Integer(description="New ID of the level this group belongs to"),
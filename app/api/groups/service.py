@@ -1,49 +1,130 @@
+import json
+
 from flask import current_app
+from sqlalchemy import event, exists, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, attributes, object_session
+from redis.exceptions import RedisError
 from marshmallow import ValidationError # Import Marshmallow's validation error
 
 # Import your DB instance and Group model
 from app import db
-from app.models import Group
-# Import shared utilities and the schema
-from app.models.Schemas import GroupSchema # Assuming GroupSchema is here
+from app.models import Group, Level
+# Import shared utilities
 from app.utils import err_resp, message, internal_err_resp # Assuming you have a validation_error helper
+from app.extensions import redis_client
+# Assuming load_data uses group_schema.dump() internally
+from .utils import get_group_schema, load_data
 
-# Initialize the schema once for the service class
+# Shared schema instances from the cached factory. load() on these returns a
+# dict of validated values; the service builds or updates the Group itself.
 # Use `partial=True` on load for updates to allow partial data
-group_schema = GroupSchema()
-group_update_schema = GroupSchema(partial=True) # Schema instance for partial updates
+group_schema = get_group_schema(load_instance=False)
+group_update_schema = get_group_schema(partial=True, load_instance=False) # Schema instance for partial updates
+# Fields an update may change (name and level_id). update_group gates on them
+# and writes nothing else; the primary key is also dump-only in GroupSchema
+_GROUP_UPDATABLE_FIELDS = frozenset(group_update_schema.load_fields) - {
+    column.key for column in Group.__table__.primary_key
+}
+
+# Columns serialized by GroupSchema. The list endpoint selects just these
+# and builds plain dicts, skipping ORM hydration and the schema dump.
+_GROUP_LIST_COLUMNS = tuple(Group.__table__.c[name] for name in group_schema.dump_fields)
+# The list query takes no parameters, so build it once and reuse it on every request.
+# id breaks ties between equal names so the order is deterministic.
+_GROUP_LIST_STMT = select(*_GROUP_LIST_COLUMNS).order_by(Group.name, Group.id)
+
+
+def _group_cache_key(group_id):
+    """ Redis key holding the serialized payload of a single group """
+    return f"group:json:{group_id}"
+
+
+# session.info key collecting the group ids a transaction's flushes touched
+_EVICT_GROUPS_INFO_KEY = "evict_group_ids"
+
+
+@event.listens_for(Group, "after_update")
+@event.listens_for(Group, "after_delete")
+def _queue_group_cache_eviction(mapper, connection, target):
+    """ Remember every group row a flush changes, whatever the write path """
+    # Runs inside the flush, before the commit: evicting here would let a
+    # concurrent read re-cache the old row. Record the committed id (a changed
+    # primary key still has it in its history) and evict after the commit
+    history = attributes.get_history(target, "id")
+    group_ids = {target.id, *history.deleted}
+    session = object_session(target)
+    session.info.setdefault(_EVICT_GROUPS_INFO_KEY, set()).update(group_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_group_cache(session):
+    """ Drop the cached payloads of the groups the committed transaction changed """
+    # Ids left over from a rolled-back flush are simply evicted at the next commit
+    group_ids = session.info.pop(_EVICT_GROUPS_INFO_KEY, None)
+    if not group_ids:
+        return
+    try:
+        redis_client.delete(*(_group_cache_key(group_id) for group_id in group_ids))
+    except RedisError as error:
+        # The DB write is already committed; a cache outage must not fail the request.
+        # The stale entries still expire after GROUP_CACHE_TTL_SECONDS.
+        current_app.logger.warning("Could not evict cached groups %s: %s", sorted(group_ids), error)
+
+
+def _level_exists(level_id):
+    """ Check that a level exists with a scalar EXISTS, without loading the row """
+    return db.session.query(exists().where(Level.id == level_id)).scalar()
 
-# Assuming load_data uses group_schema.dump() internally
-from .utils import load_data
 
 class GroupService:
     @staticmethod
     def get_group_data(group_id):
         """ Get group data by its ID """
-        group = Group.query.get(group_id)
+        # Read-through cache: serve hot groups without touching the DB or the schema.
+        # The cache is optional, so a Redis outage falls back to the DB
+        try:
+            cached_group = redis_client.get(_group_cache_key(group_id))
+        except RedisError as error:
+            current_app.logger.warning("Could not read cached group %s: %s", group_id, error)
+            cached_group = None
+        if cached_group is not None:
+            resp = message(True, "Group data sent successfully")
+            resp["group"] = json.loads(cached_group)
+            return resp, 200
+
+        group = db.session.get(Group, group_id)
         if not group:
             return err_resp("Group not found!", "group_404", 404)
         try:
             group_data = load_data(group) # Uses schema.dump() via load_data
+            try:
+                redis_client.set(
+                    _group_cache_key(group_id),
+                    json.dumps(group_data),
+                    ex=current_app.config["GROUP_CACHE_TTL_SECONDS"],
+                )
+            except RedisError as error:
+                # The DB read succeeded; a failed cache fill must not fail the request
+                current_app.logger.warning("Could not cache group %s: %s", group_id, error)
             resp = message(True, "Group data sent successfully")
             resp["group"] = group_data
             return resp, 200
         except Exception as error:
-            current_app.logger.error(f"Error getting group data for ID {group_id}: {error}", exc_info=True)
+            current_app.logger.error("Error getting group data for ID %s: %s", group_id, error, exc_info=True)
             return internal_err_resp()
 
     @staticmethod
     def get_all_groups():
         """ Get a list of all groups """
         try:
-            groups = Group.query.order_by(Group.name).all()
-            groups_data = load_data(groups, many=True) # Uses schema.dump(many=True) via load_data
+            rows = db.session.execute(_GROUP_LIST_STMT).mappings()
+            groups_data = [dict(row) for row in rows]
             resp = message(True, "Groups list retrieved successfully")
             resp["groups"] = groups_data
             return resp, 200
         except Exception as error:
-            current_app.logger.error(f"Error getting all groups: {error}", exc_info=True)
+            current_app.logger.error("Error getting all groups: %s", error, exc_info=True)
             return internal_err_resp()
 
     # --- CREATE (Using schema.load for validation) ---
@@ -55,10 +136,9 @@ class GroupService:
             # load() raises ValidationError if validation fails
             validated_data = group_schema.load(data)
 
-            # Optional: Add checks not covered by schema (e.g., foreign key existence)
-            # from app.models.level import Level
-            # if not Level.query.get(validated_data['level_id']):
-            #     return err_resp("Level not found!", "level_404", 400)
+            # Foreign key existence isn't covered by the schema
+            if not _level_exists(validated_data["level_id"]):
+                return err_resp("Level not found!", "level_404", 400)
 
             # Create the Group instance using validated data
             new_group = Group(**validated_data) # Use validated data
@@ -74,49 +154,66 @@ class GroupService:
 
         except ValidationError as err:
             # Handle Marshmallow validation errors
-            current_app.logger.warning(f"Validation error creating group: {err.messages}")
+            current_app.logger.warning("Validation error creating group: %s", err.messages)
             # Use your validation_error helper if you have one, otherwise use err_resp
             # return validation_error(False, err.messages), 400
             return err_resp(f"Validation failed: {err.messages}", "validation_error", 400)
 
         except SQLAlchemyError as error:
              db.session.rollback()
-             current_app.logger.error(f"Database error creating group: {error}", exc_info=True)
+             current_app.logger.error("Database error creating group: %s", error, exc_info=True)
              return internal_err_resp()
         except Exception as error:
             db.session.rollback()
-            current_app.logger.error(f"Error creating group: {error}", exc_info=True)
+            current_app.logger.error("Error creating group: %s", error, exc_info=True)
             return internal_err_resp()
 
     # --- UPDATE (Using schema.load(partial=True) for validation) ---
     @staticmethod
     def update_group(group_id, data):
         """ Update an existing group by ID after validating input data """
-        group = Group.query.get(group_id)
-        if not group:
-            return err_resp("Group not found!", "group_404", 404)
-
         try:
-            # Validate the incoming partial data using the partial schema instance
-            # load() raises ValidationError if validation fails
-            # Pass existing model instance to load into via `instance=` if schema is configured for it
-            # validated_data = group_update_schema.load(data, instance=group, partial=True) # Option 1: Load into instance
-            validated_data = group_update_schema.load(data) # Option 2: Get validated dict
-
-            # --- Update the model fields using the validated data ---
-            # Option 1 (if loaded into instance): The 'group' object might already be updated by load()
-            # Option 2 (if load returned a dict): Update manually
-            for key, value in validated_data.items():
-                 setattr(group, key, value)
-
-            # Optional: Add checks not covered by schema (e.g., foreign key existence)
-            # if 'level_id' in validated_data:
-            #    from app.models.level import Level
-            #    if not Level.query.get(validated_data['level_id']):
-            #        return err_resp("New Level not found!", "level_404", 400)
-
-            db.session.add(group) # Add potentially modified group to session
-            db.session.commit()
+            if not isinstance(data, dict):
+                return err_resp("Request body must be a JSON object.", "validation_error", 400)
+            # Nothing to update: skip the schema load and the DB entirely
+            if not _GROUP_UPDATABLE_FIELDS & data.keys():
+                return err_resp("No updatable fields provided.", "empty_update_data", 400)
+
+            # Validate the incoming partial data using the partial schema instance.
+            # load() returns a dict of the validated fields (load_instance=False),
+            # touches neither the session nor the DB, and raises ValidationError
+            # if validation fails
+            validated_data = group_update_schema.load(data)
+
+            # Read phase: the row fetch and the level EXISTS are the only queries.
+            # no_autoflush keeps them from flushing anything already pending in the
+            # session, so the single commit below issues all of this update's writes
+            with db.session.no_autoflush:
+                # Validation doesn't depend on the stored row, so only hit the DB
+                # once the payload is known to be valid
+                group = db.session.get(Group, group_id)
+                if not group:
+                    return err_resp("Group not found!", "group_404", 404)
+
+                # Only updatable fields whose value actually differs need writing
+                changes = {
+                    key: value
+                    for key, value in validated_data.items()
+                    if key in _GROUP_UPDATABLE_FIELDS and getattr(group, key) != value
+                }
+
+                # Foreign key existence isn't covered by the schema
+                if "level_id" in changes and not _level_exists(changes["level_id"]):
+                    return err_resp("New Level not found!", "level_404", 400)
+
+            # Idempotent update: the loaded row already matches, skip UPDATE + COMMIT
+            if changes:
+                # --- Update the model fields using the validated data ---
+                for key, value in changes.items():
+                    setattr(group, key, value)
+
+                # group is already tracked by the session; commit flushes its dirty attributes
+                db.session.commit()
 
             # Serialize the updated object for the response
             group_data = load_data(group) # Uses schema.dump()
@@ -125,26 +222,25 @@ class GroupService:
             return resp, 200 # 200 OK
 
         except ValidationError as err:
-            # Handle Marshmallow validation errors
-            db.session.rollback() # Rollback any potential changes made by load(instance=...)
-            current_app.logger.warning(f"Validation error updating group {group_id}: {err.messages}")
+            # Handle Marshmallow validation errors (nothing has been modified yet)
+            current_app.logger.warning("Validation error updating group %s: %s", group_id, err.messages)
             # return validation_error(False, err.messages), 400
             return err_resp(f"Validation failed: {err.messages}", "validation_error", 400)
 
         except SQLAlchemyError as error:
              db.session.rollback()
-             current_app.logger.error(f"Database error updating group {group_id}: {error}", exc_info=True)
+             current_app.logger.error("Database error updating group %s: %s", group_id, error, exc_info=True)
              return internal_err_resp()
         except Exception as error:
             db.session.rollback()
-            current_app.logger.error(f"Error updating group {group_id}: {error}", exc_info=True)
+            current_app.logger.error("Error updating group %s: %s", group_id, error, exc_info=True)
             return internal_err_resp()
 
     # --- DELETE (No input validation needed typically) ---
     @staticmethod
     def delete_group(group_id):
         """ Delete a group by ID """
-        group = Group.query.get(group_id)
+        group = db.session.get(Group, group_id)
         if not group:
             return err_resp("Group not found!", "group_404", 404)
 
@@ -159,9 +255,9 @@ class GroupService:
 
         except SQLAlchemyError as error:
              db.session.rollback()
-             current_app.logger.error(f"Database error deleting group {group_id}: {error}", exc_info=True)
+             current_app.logger.error("Database error deleting group %s: %s", group_id, error, exc_info=True)
              return err_resp(f"Could not delete group due to a database constraint or error.", "delete_error_db", 500)
         except Exception as error:
             db.session.rollback()
-            current_app.logger.error(f"Error deleting group {group_id}: {error}", exc_info=True)
+            current_app.logger.error("Error deleting group %s: %s", group_id, error, exc_info=True)
             return internal_err_resp()
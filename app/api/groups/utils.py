@@ -1,19 +1,36 @@
+from functools import lru_cache
+
 # Assuming your GroupSchema correctly maps the Group model
 from app.models import GroupSchema
 
+
+@lru_cache(maxsize=32)
+def get_group_schema(many=False, partial=False, exclude=(), load_instance=True):
+    """
+    Return the shared GroupSchema instance for this combination of options.
+
+    Schema construction walks every field, so each variant is built once
+    and reused. exclude must be a tuple so the arguments stay hashable.
+    With load_instance=False, load() returns a dict of validated values
+    instead of a Group instance.
+    """
+    return GroupSchema(
+        many=many, partial=partial, exclude=exclude, load_instance=load_instance
+    )
+
+
 def load_data(group_db_obj, many=False):
     """
     Load group data using the GroupSchema.
 
     Parameters:
         group_db_obj: A Group SQLAlchemy object or a list of them.
+            With many=True pass a list already fetched by one query (not a
+            lazy generator) so the single dump doesn't re-query per element.
         many: Boolean indicating if group_db_obj is a list.
     Returns:
         A dictionary or list of dictionaries representing the group(s).
     """
-    # Instantiate the schema, passing 'many=True' if handling a list
-    group_schema = GroupSchema(many=many)
     # Serialize the database object(s) into dictionary format
-    data = group_schema.dump(group_db_obj)
+    data = get_group_schema(many=many).dump(group_db_obj)
     return data
-
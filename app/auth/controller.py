@@ -5,7 +5,7 @@ from app.extensions import limiter
 
 # Ensure validation_error is correctly implemented in app.utils
 from app.utils import validation_error
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt
 
 # Auth modules
 from .service import AuthService
@@ -239,8 +239,6 @@ class AuthRefresh(Resource):
     @jwt_required(refresh=True)  # Ensures it's a valid refresh token
     def post(self):
         """Refresh access token using Bearer refresh token"""
-        print("identity gotten from refresh token")
-        identity = get_jwt_identity()  # Get identity from refresh token
-        role = get_jwt()["role"]
-        print(identity)
-        return AuthService.refresh(identity, role)
+        # One payload lookup serves both claims (identity is the "sub" claim)
+        claims = get_jwt()
+        return AuthService.refresh(claims["sub"], claims["role"])
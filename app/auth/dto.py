@@ -1,7 +1,11 @@
 from flask_restx import Namespace, fields
 
+from app.utils import compiled_model
+
 
 class AuthDto:
+    # Request bodies validated with @api.expect(..., validate=True) are built as
+    # compiled_model so their JSON Schema validator is created once, not per request
     api = Namespace(
         "auth",
         description="Authenticate and receive tokens.",
@@ -25,7 +29,8 @@ class AuthDto:
         description="No request body needed. Send refresh token in Authorization header (Bearer).",
     )
 
-    auth_login = api.model(
+    auth_login = compiled_model(
+        api,
         "Login data",
         {
             "email": fields.String(required=True, example="gulag@maserati.com"),
@@ -39,7 +44,8 @@ class AuthDto:
     )
 
     # Fixed syntax error (removed extra closing parenthesis)
-    auth_forgot = api.model(
+    auth_forgot = compiled_model(
+        api,
         "Forgot password data",
         {
             "email": fields.String(
@@ -56,7 +62,8 @@ class AuthDto:
     )
 
     # ---- NEW MODEL ----
-    auth_reset_password = api.model(
+    auth_reset_password = compiled_model(
+        api,
         "Reset password data",
         {
             "token": fields.String(
@@ -85,7 +92,8 @@ class AuthDto:
         # },
     )
 
-    auth_register = api.model(
+    auth_register = compiled_model(
+        api,
         "Registration data",
         {
             "email": fields.String(required=True, example="gulag@maserati.com"),
@@ -104,7 +112,8 @@ class AuthDto:
             "last_name": fields.String(required=True, example="Doe"),
         },
     )
-    auth_verify_otp = api.model(
+    auth_verify_otp = compiled_model(
+        api,
         "Verify OTP",
         {
             "otp": fields.String(required=True, example="123456"),
@@ -4,9 +4,9 @@ from datetime import timedelta
 
 from flask import current_app
 from flask_jwt_extended import create_refresh_token, create_access_token
-from werkzeug.security import (
-    generate_password_hash,
-)
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from redis.exceptions import RedisError
 from itsdangerous import (
     URLSafeTimedSerializer,
     SignatureExpired,
@@ -15,13 +15,14 @@ from itsdangerous import (
 
 from app import db
 from app.utils import message, err_resp, internal_err_resp
+from app.hashing import hash_password, password_needs_rehash, submit_hash_password
 from app.models import Parent, Admin, Teacher, Student
 from app.models.Schemas import AdminSchema, ParentSchema, TeacherSchema, StudentSchema
 from app.extensions import (
     redis_client,
     jwt,
 )  # Assuming redis is initialized in extensions
-from app.service import send_email
+from app.service import send_email_async
 
 schemas = {
     "parent": ParentSchema(),
@@ -35,6 +36,14 @@ models = {
     "student": Student,
     "admin": Admin,
 }
+# Claims a registration's OTP key before the password is hashed. An empty JSON
+# list, so verify_otp reads it as "no OTP issued yet"
+OTP_PENDING_PLACEHOLDER = "[]"
+
+
+def _email_taken(model, email):
+    """True if an account of this model already uses the email (EXISTS, no row load)."""
+    return db.session.query(exists().where(model.email == email)).scalar()
 
 
 # --- Placeholder for Email Sending ---
@@ -43,12 +52,10 @@ models = {
 def send_password_reset_email(to_email, reset_link):
     """Sends the password reset link to the user."""
     try:
-        # Example using print (replace with real email sending)
-        print("---- SENDING PASSWORD RESET EMAIL ----")
-        print(f"To: {to_email}")
-        print(f"Subject: Reset Your Password")
-        print(f"Body: Click the link below to reset your password:\n{reset_link}")
-        print("---- END EMAIL ----")
+        # Example using debug logging (replace with real email sending)
+        current_app.logger.debug(
+            "Password reset email for %s with link %s", to_email, reset_link
+        )
         # --- Integrate your email sending code here ---
         # Example using Flask-Mail (if configured)
         # from flask_mail import Message
@@ -58,11 +65,11 @@ def send_password_reset_email(to_email, reset_link):
         #               recipients=[to_email])
         # msg.body = f"Click the link below to reset your password:\n{reset_link}\n\nIf you did not request this, please ignore this email."
         # mail.send(msg)
-        current_app.logger.info(f"Password reset email ostensibly sent to {to_email}")
+        current_app.logger.info("Password reset email ostensibly sent to %s", to_email)
         return True
     except Exception as e:
         current_app.logger.error(
-            f"Failed to send password reset email to {to_email}: {e}", exc_info=True
+            "Failed to send password reset email to %s: %s", to_email, e, exc_info=True
         )
         return False
 
@@ -80,7 +87,11 @@ class AuthService:
 
     @staticmethod
     def _get_serializer():
-        """Creates an instance of the timed serializer."""
+        """Returns the app's timed serializer, creating it on first use."""
+        serializer = current_app.extensions.get("password_reset_serializer")
+        if serializer is not None:
+            return serializer
+
         if (
             "SECRET_KEY" not in current_app.config
             or not current_app.config["SECRET_KEY"]
@@ -90,9 +101,12 @@ class AuthService:
             )
             raise ValueError("Application is not configured with a SECRET_KEY.")
         # Using a salt makes the signature unique for password resets
-        return URLSafeTimedSerializer(
+        serializer = URLSafeTimedSerializer(
             current_app.config["SECRET_KEY"], salt="password-reset-salt"
         )
+        # Cached per app, so each forgot/reset request reuses the same instance
+        current_app.extensions["password_reset_serializer"] = serializer
+        return serializer
 
     @staticmethod
     def login(data):
@@ -109,8 +123,20 @@ class AuthService:
             if not user:
                 return err_resp("Email does not match any account.", "email_404", 404)
 
-            # Assuming user model has verify_password method using check_password_hash
+            # Assuming user model has verify_password method using app.hashing.check_password
             if user.verify_password(password):
+                # Transparently upgrade legacy or outdated hashes to the current Argon2 profile
+                if password_needs_rehash(user.password):
+                    try:
+                        user.password = hash_password(password)
+                        db.session.commit()
+                    except SQLAlchemyError as error:
+                        # The old hash still works, so a failed upgrade must not block login
+                        db.session.rollback()
+                        current_app.logger.warning(
+                            "Password rehash failed for %s: %s", email, error
+                        )
+
                 user_info = schemas[role].dump(user)
                 identity = str(user.id)
                 additional_claims = {"role": role}
@@ -142,7 +168,7 @@ class AuthService:
                 )  # Unauthorized
 
         except Exception as error:
-            current_app.logger.error(f"Login exception: {error}", exc_info=True)
+            current_app.logger.error("Login exception: %s", error, exc_info=True)
             return internal_err_resp()
 
     @staticmethod
@@ -167,7 +193,7 @@ class AuthService:
             # Status code 200 OK for successful logout/revocation
             return resp, 200
         except Exception as e:
-            current_app.logger.error(f"Logout failed: {e}", exc_info=True)
+            current_app.logger.error("Logout failed: %s", e, exc_info=True)
             # Don't expose internal errors directly
             return err_resp(
                 "Logout failed due to an internal issue.", "logout_failed", 500
@@ -188,22 +214,28 @@ class AuthService:
             if role not in models:
                 # Log this issue but still return generic success to user
                 current_app.logger.warning(
-                    f"Forgot password attempt with invalid role: {role}"
+                    "Forgot password attempt with invalid role: %s", role
                 )
                 return message(True, generic_success_message), status_code
 
-            user = models[role].query.filter_by(email=email).first()
+            # Only the PK goes into the token, so read it alone via the unique email index
+            model = models[role]
+            user_id = (
+                db.session.query(model.id).filter(model.email == email).scalar()
+            )
 
-            if user:
+            if user_id is not None:
                 # --- User found, generate token and send email ---
                 serializer = AuthService._get_serializer()
                 # Include user ID and role in the token payload
-                token_payload = {"user_id": user.id, "role": role}
+                token_payload = {"user_id": user_id, "role": role}
                 try:
                     token = serializer.dumps(token_payload)
                 except Exception as e:
                     current_app.logger.error(
-                        f"Failed to serialize password reset token for {email}: {e}",
+                        "Failed to serialize password reset token for %s: %s",
+                        email,
+                        e,
                         exc_info=True,
                     )
                     # Still return generic success, but log the failure
@@ -233,25 +265,28 @@ class AuthService:
                         "RESET_LINK_EXPIRATION_MINUTES"
                     ],
                 }
-                email_sent = send_email(
+                send_email_async(
                     to_email=email,
                     subject=subject,
                     template_prefix=template,
                     context=context,
                 )
 
-                email_sent = send_password_reset_email(user.email, reset_link)
+                email_sent = send_password_reset_email(email, reset_link)
                 if not email_sent:
                     # Log the failure but still return generic success
                     current_app.logger.error(
-                        f"Failed to send password reset email to {email} via configured method."
+                        "Failed to send password reset email to %s via configured method.",
+                        email,
                     )
 
             else:
                 # --- User not found ---
                 # Log this for monitoring if desired, but don't tell the requester
                 current_app.logger.info(
-                    f"Password reset requested for non-existent user/role: {email}/{role}"
+                    "Password reset requested for non-existent user/role: %s/%s",
+                    email,
+                    role,
                 )
 
             # Return the generic success message whether user existed or email failed
@@ -259,12 +294,12 @@ class AuthService:
 
         except ValueError as ve:  # Catch specific config errors like missing SECRET_KEY
             current_app.logger.critical(
-                f"Configuration error during forgot password: {ve}"
+                "Configuration error during forgot password: %s", ve
             )
             return internal_err_resp()  # Return a generic internal error
         except Exception as error:
             current_app.logger.error(
-                f"Forgot password exception for {email}: {error}", exc_info=True
+                "Forgot password exception for %s: %s", email, error, exc_info=True
             )
             # Even on unexpected errors, return generic success if possible,
             # unless it's a critical config issue caught above.
@@ -292,10 +327,14 @@ class AuthService:
                     "Invalid or corrupted password reset token.", "token_invalid", 400
                 )
 
+            # Token is valid: hash on the pool while the user lookup hits the DB
+            password_hash_future = submit_hash_password(new_password)
+
             # Fetch the user based on ID and Role from token
-            user = models[role].query.get(user_id)
+            user = db.session.get(models[role], user_id)
 
             if not user:
+                password_hash_future.cancel()
                 # User might have been deleted after token was issued
                 return err_resp(
                     "User associated with this token not found.", "user_not_found", 404
@@ -303,10 +342,8 @@ class AuthService:
 
             # --- Update Password ---
             # Assuming user model has a 'password' attribute or setter
-            user.password = generate_password_hash(new_password)
-            db.session.add(
-                user
-            )  # Add user to session if needed (or rely on query.get keeping it in session)
+            user.password = password_hash_future.result()
+            # db.session.get() already tracks user; commit flushes the dirty password
             db.session.commit()
 
             # --- Optional: Invalidate user's other sessions ---
@@ -322,12 +359,12 @@ class AuthService:
             return err_resp("Invalid password reset link.", "token_invalid", 400)
         except ValueError as ve:  # Catch specific config errors like missing SECRET_KEY
             current_app.logger.critical(
-                f"Configuration error during reset password: {ve}"
+                "Configuration error during reset password: %s", ve
             )
             return internal_err_resp()
         except Exception as error:
             current_app.logger.error(
-                f"Reset password exception: {error}", exc_info=True
+                "Reset password exception: %s", error, exc_info=True
             )
             return internal_err_resp()
 
@@ -349,15 +386,24 @@ class AuthService:
                 "Admin registration is not allowed.", "admin_registration", 403
             )
 
-        if models[role].query.filter_by(email=email).first() is not None:
+        if _email_taken(models[role], email):
             return err_resp(
                 "Email is already being used.", "email_taken", 409
             )  # 409 Conflict is suitable
 
+        redis_key = f"otp:register:{email}"  # Use context in key
+        claimed = False
         try:
-            # Check if OTP exists in Redis for this email (prevents re-sending within expiry window)
-            redis_key = f"otp:register:{email}"  # Use context in key
-            if redis_client.exists(redis_key):
+            # SET NX claims the key atomically with a cheap placeholder *before* the
+            # password is hashed: if an OTP is still pending for this email the request
+            # is rejected without paying for Argon2 (prevents re-sending within expiry window)
+            claimed = redis_client.set(
+                redis_key,
+                OTP_PENDING_PLACEHOLDER,
+                ex=current_app.config["OTP_EXPIRATION_SECONDS"],
+                nx=True,
+            )
+            if not claimed:
                 ttl = redis_client.ttl(redis_key)
                 return err_resp(
                     f"An OTP has already been sent. Please check your inbox or wait {ttl} seconds.",
@@ -369,9 +415,9 @@ class AuthService:
             # Store all necessary info to create the user later
             user_info_to_store = {
                 "email": email,
-                "password_hash": generate_password_hash(
-                    password
-                ),  # Store hash directly
+                # Hashed inline: nothing here could overlap with it, so a pool hop
+                # would only add latency
+                "password_hash": hash_password(password),  # Store hash directly
                 "phone_number": phone_number,
                 "first_name": first_name,
                 "last_name": last_name,
@@ -380,11 +426,17 @@ class AuthService:
             # Info stored in Redis: [user_data_dict, otp_code, user_role]
             info_for_redis = [user_info_to_store, str(otp), role]  # Store OTP as string
 
-            redis_client.set(
-                redis_key,
-                json.dumps(info_for_redis),
-                ex=current_app.config["OTP_EXPIRATION_SECONDS"],
+            # Replace the placeholder in place, keeping the expiry set when it was claimed
+            was_stored = redis_client.set(
+                redis_key, json.dumps(info_for_redis), xx=True, keepttl=True
             )
+            if not was_stored:
+                # The claim expired or was consumed while hashing
+                return err_resp(
+                    "Registration could not be completed. Please try again.",
+                    "registration_interrupted",
+                    409,
+                )
 
             # --- Send OTP Email/SMS ---
             # send_registration_otp(email, otp) # Implement this function
@@ -397,7 +449,7 @@ class AuthService:
                 "otp_code": otp_code,
                 "expiration_minutes": current_app.config["OTP_EXPIRATION_MINUTES"],
             }
-            email_sent = send_email(
+            send_email_async(
                 to_email=email,
                 subject=subject,
                 template_prefix=template,
@@ -411,8 +463,16 @@ class AuthService:
 
         except Exception as error:
             current_app.logger.error(
-                f"Registration exception for {email}: {error}", exc_info=True
+                "Registration exception for %s: %s", email, error, exc_info=True
             )
+            if claimed:
+                # Release the claim so the user can retry right away
+                try:
+                    redis_client.delete(redis_key)
+                except RedisError as redis_error:
+                    current_app.logger.warning(
+                        "Could not release OTP claim for %s: %s", email, redis_error
+                    )
             return internal_err_resp()
 
     @staticmethod
@@ -432,6 +492,11 @@ class AuthService:
                 )
 
             otp_data = json.loads(otp_entry_json)
+            if not otp_data:
+                # Registration placeholder: the OTP hasn't been issued yet
+                return err_resp(
+                    "OTP has expired or is invalid.", "otp_invalid_or_expired", 400
+                )
             user_info_stored = otp_data[0]
             stored_otp = otp_data[1]
             role = otp_data[2]
@@ -444,20 +509,12 @@ class AuthService:
             # --- OTP is valid, create the user ---
             if role not in models or role not in schemas:
                 current_app.logger.error(
-                    f"Invalid role '{role}' found in OTP data for {email}"
+                    "Invalid role '%s' found in OTP data for %s", role, email
                 )
                 return (
                     internal_err_resp()
                 )  # Should not happen if register logic is correct
 
-            # Check again if email was taken *between* registration start and OTP verification
-            if models[role].query.filter_by(email=email).first() is not None:
-                return err_resp(
-                    "Email has been registered by another user.",
-                    "email_taken_concurrently",
-                    409,
-                )
-
             # Create model instance (ensure schema handles 'password_hash')
             # Modify schemas if needed to accept 'password_hash' instead of 'password'
             # Or directly instantiate the model here:
@@ -472,8 +529,21 @@ class AuthService:
                 # Add other fields...
             )
 
+            # No pre-check SELECT: the unique email index decides atomically whether
+            # the email was taken *between* registration start and OTP verification
             db.session.add(new_user)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                # Only the failure path pays for telling a duplicate apart from other violations
+                if not _email_taken(models[role], email):
+                    raise
+                return err_resp(
+                    "Email has been registered by another user.",
+                    "email_taken_concurrently",
+                    409,
+                )
 
             # --- Login the user immediately after verification ---
             identity = {"id": new_user.id, "role": role}
@@ -502,7 +572,7 @@ class AuthService:
 
         except json.JSONDecodeError:
             current_app.logger.error(
-                f"Failed to decode JSON OTP data from Redis for {email}"
+                "Failed to decode JSON OTP data from Redis for %s", email
             )
             return err_resp(
                 "Failed to verify OTP due to internal state error.",
@@ -513,7 +583,7 @@ class AuthService:
             # Rollback potentially uncommitted changes if DB error occurred before commit
             db.session.rollback()
             current_app.logger.error(
-                f"Verify OTP exception for {email}: {error}", exc_info=True
+                "Verify OTP exception for %s: %s", email, error, exc_info=True
             )
             return internal_err_resp()
 
@@ -524,7 +594,7 @@ class AuthService:
             # Identity should contain {'id': user_id, 'role': user_role} if set during login/register
             if not user_id or not role:
                 current_app.logger.warning(
-                    f"Missing user_id or role in refresh token payload."
+                    "Missing user_id or role in refresh token payload."
                 )
                 return err_resp(
                     "Invalid refresh token.", "token_invalid", 401
@@ -535,7 +605,7 @@ class AuthService:
                 return err_resp(
                     "Invalid role associated with token.", "token_invalid", 401
                 )
-            user = models[role].query.get(user_id)
+            user = db.session.get(models[role], user_id)
             if not user:  # or (hasattr(user, 'is_active') and not user.is_active):
                 return err_resp(
                     "User associated with token not found or inactive.",
@@ -556,7 +626,9 @@ class AuthService:
             return resp, 200  # OK
         except Exception as error:
             current_app.logger.error(
-                f"Token refresh exception for identity {user_id}: {error}",
+                "Token refresh exception for identity %s: %s",
+                user_id,
+                error,
                 exc_info=True,
             )
             return internal_err_resp()
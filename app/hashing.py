@@ -0,0 +1,97 @@
+"""Password hashing module
+
+New passwords are hashed with Argon2id (argon2-cffi). Hashes created
+before the switch (werkzeug scrypt/pbkdf2) still verify and are upgraded
+on the next successful login.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+
+ARGON2_PREFIX = "$argon2"
+# Upper bound for calibration so a slow host can't stall startup indefinitely
+MAX_CALIBRATED_TIME_COST = 32
+
+# OWASP Argon2id profile: 19 MiB of memory, 2 iterations, 1 lane,
+# 32-byte hash and 16-byte salt.
+# Replaced by init_app() with the configured parameters.
+password_hasher = PasswordHasher(
+    time_cost=2, memory_cost=19456, parallelism=1, hash_len=32, salt_len=16
+)
+
+# Argon2 releases the GIL while hashing, so one worker per core lets
+# concurrent signups/resets hash in parallel without blocking request threads.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash"
+)
+
+
+def calibrate_time_cost(target_ms, memory_cost, parallelism):
+    """
+    Find the time_cost whose hash takes at least target_ms on this host.
+
+    Starts at 1 and doubles until the measured hash time reaches the
+    target or MAX_CALIBRATED_TIME_COST is hit.
+    """
+    time_cost = 1
+    while True:
+        hasher = PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= target_ms or time_cost >= MAX_CALIBRATED_TIME_COST:
+            return time_cost
+        time_cost *= 2
+
+
+def init_app(app):
+    """
+    Build the process-wide hasher from the pinned ARGON2_* config values.
+
+    time_cost is never calibrated here: workers calibrating on their own
+    could disagree and rehash users' passwords back and forth on login.
+    Use `flask calibrate-argon2` to pick a value, then pin ARGON2_TIME_COST.
+    """
+    global password_hasher
+
+    password_hasher = PasswordHasher(
+        time_cost=app.config["ARGON2_TIME_COST"],
+        memory_cost=app.config["ARGON2_MEMORY_COST"],
+        parallelism=app.config["ARGON2_PARALLELISM"],
+        hash_len=app.config["ARGON2_HASH_LEN"],
+        salt_len=app.config["ARGON2_SALT_LEN"],
+    )
+
+
+def hash_password(password):
+    """Return the Argon2id hash of a plain text password."""
+    return password_hasher.hash(password)
+
+
+def submit_hash_password(password):
+    """Start hashing on the shared pool; returns a Future with the hash."""
+    return _hash_pool.submit(hash_password, password)
+
+
+def check_password(password_hash, password):
+    """Check a plain text password against a stored hash of either scheme."""
+    if not password_hash.startswith(ARGON2_PREFIX):
+        return check_password_hash(password_hash, password)
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(password_hash):
+    """True if the stored hash is legacy or uses outdated Argon2 parameters."""
+    if not password_hash.startswith(ARGON2_PREFIX):
+        return True
+    return password_hasher.check_needs_rehash(password_hash)
@@ -1,7 +1,7 @@
 from app import db
 from datetime import datetime, timezone
 from . import Column, Model
-from werkzeug.security import check_password_hash
+from app.hashing import check_password
 
 
 class Admin(Model):
@@ -32,4 +32,4 @@ class Admin(Model):
         return f"<Admin id={self.id} email={self.email}>"
 
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
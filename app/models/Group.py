@@ -19,6 +19,9 @@ class Group(Model):
     )
     sessions = relationship("Session", back_populates="group")
 
+    # Matches the (name, id) ordering of the group list endpoint
+    __table_args__ = (db.Index("ix_group_name_id", "name", "id"),)
+
     def __init__(self, name, level_id):
         self.name = name
         self.level_id = level_id
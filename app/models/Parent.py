@@ -1,7 +1,7 @@
 from app import db
 from . import Column, Model, relationship
 from datetime import datetime, timezone
-from werkzeug.security import  check_password_hash
+from app.hashing import check_password
 
 
 class Parent(Model):
@@ -61,4 +61,4 @@ class Parent(Model):
         self.last_name = last_name
 
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
@@ -51,6 +51,10 @@ class GroupSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Group
         load_instance = True
+        # level_id is a required, client-supplied column (see GroupDto)
+        include_fk = True
+        # The primary key is assigned by the DB (readonly in GroupDto); load() rejects it
+        dump_only = ("id",)
 
 
 class LessonSchema(ma.SQLAlchemyAutoSchema):
@@ -1,7 +1,7 @@
 from app import db
 from datetime import datetime, timezone
 from . import Column, Model, relationship
-from werkzeug.security import check_password_hash
+from app.hashing import check_password
 
 
 class Student(Model):
@@ -64,4 +64,4 @@ class Student(Model):
         self.docs_url = docs_url
 
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
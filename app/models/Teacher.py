@@ -1,7 +1,7 @@
 from app import db
 from datetime import datetime, timezone
 from . import Column, Model, relationship
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.hashing import check_password
 
 
 class Teacher(Model):
@@ -65,4 +65,4 @@ class Teacher(Model):
         self.module_key = module_key
 
     def verify_password(self, password):
-        return check_password_hash(self.password, password)
+        return check_password(self.password, password)
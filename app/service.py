@@ -1,4 +1,7 @@
 # madrassati/auth/utils.py
+from concurrent.futures import ThreadPoolExecutor
+
+from jinja2 import TemplateError, TemplateNotFound
 from mailjet_rest import Client  # Import Mailjet client
 from flask import (
     current_app,
@@ -8,6 +11,13 @@ from flask import (
 from flask import current_app
 
 # --- Constants ---
+# Mailjet calls are I/O bound; a small fixed pool caps concurrent sends, and
+# the executor finishes queued emails before the interpreter exits.
+EMAIL_POOL_WORKERS = 4
+
+_email_pool = ThreadPoolExecutor(
+    max_workers=EMAIL_POOL_WORKERS, thread_name_prefix="send-email"
+)
 
 
 # --- Email Sending Function ---
@@ -26,13 +36,9 @@ def send_email(to_email: str, subject: str, template_prefix: str, context: dict)
         bool: True if email sending was apparently successful (status 200), False otherwise.
     """
     api_key = current_app.config.get("MAILJET_API_KEY")
-    print(api_key)
     secret_key = current_app.config.get("MAILJET_SECRET_KEY")
-    print (secret_key)
     sender_email = current_app.config.get("MAILJET_SENDER")
-    print(sender_email)
     sender_name = current_app.config.get("MAILJET_SENDER_NAME")  # Use configured name
-    print(sender_name)
 
     # Ensure configuration is present
     if not all([api_key, secret_key, sender_email]):
@@ -52,19 +58,25 @@ def send_email(to_email: str, subject: str, template_prefix: str, context: dict)
         html_body = render_template(f"{template_prefix}.html", **context)
     except Exception as e:
         current_app.logger.error(
-            f"Error rendering HTML template {template_prefix}.html: {e}"
+            "Error rendering HTML template %s.html: %s", template_prefix, e
         )
         return False
 
     try:
         # Attempt to render text part, optional
         text_body = render_template(f"{template_prefix}.txt", **context)
-    except Exception:
+    except TemplateNotFound:
         # If text template doesn't exist, create a basic fallback
         text_body = f"Please view this email in an HTML-compatible client. Subject: {subject}. OTP: {context.get('otp_code', 'N/A')}"
         current_app.logger.info(
-            f"Text template {template_prefix}.txt not found, using fallback."
+            "Text template %s.txt not found, using fallback.", template_prefix
+        )
+    except TemplateError as e:
+        # The text template exists but is broken; don't send a half-rendered email
+        current_app.logger.error(
+            "Error rendering text template %s.txt: %s", template_prefix, e
         )
+        return False
 
     message_data = {
         "Messages": [
@@ -86,20 +98,49 @@ def send_email(to_email: str, subject: str, template_prefix: str, context: dict)
         result = mailjet.send.create(data=message_data)
         if result.status_code == 200:
             current_app.logger.info(
-                f"Email sent successfully via Mailjet to {to_email}. Subject: '{subject}'."
+                "Email sent successfully via Mailjet to %s. Subject: '%s'.",
+                to_email,
+                subject,
             )
             return True
         else:
             # Log detailed error from Mailjet if possible
             error_info = result.json()
             current_app.logger.error(
-                f"Mailjet API error sending email to {to_email}. Status: {result.status_code}. Response: {error_info}"
+                "Mailjet API error sending email to %s. Status: %s. Response: %s",
+                to_email,
+                result.status_code,
+                error_info,
             )
             return False
     except Exception as e:
         # Catch potential network errors or other issues with the request
         current_app.logger.error(
-            f"Exception occurred sending email via Mailjet to {to_email}: {e}",
+            "Exception occurred sending email via Mailjet to %s: %s",
+            to_email,
+            e,
             exc_info=True,
         )
         return False
+
+
+def _send_email_with_context(app, to_email, subject, template_prefix, context):
+    # Background threads don't inherit the request's app context, so push one
+    with app.app_context():
+        return send_email(to_email, subject, template_prefix, context)
+
+
+def send_email_async(to_email: str, subject: str, template_prefix: str, context: dict):
+    """
+    Sends an email on the shared sender pool so the request doesn't wait on Mailjet.
+
+    Takes the same arguments as send_email. Delivery failures are logged by
+    send_email; the caller gets no result.
+
+    Returns:
+        Future: Resolves to send_email's return value.
+    """
+    app = current_app._get_current_object()
+    return _email_pool.submit(
+        _send_email_with_context, app, to_email, subject, template_prefix, context
+    )
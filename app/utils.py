@@ -1,3 +1,10 @@
+from http import HTTPStatus
+
+from flask_restx import Model, abort
+from jsonschema import Draft4Validator
+from jsonschema.exceptions import ValidationError
+
+
 def message(status, message):
     response_object = {"status": status, "message": message}
     return response_object
@@ -19,3 +26,42 @@ def internal_err_resp():
     err = message(False, "Something went wrong during the process!")
     err["error_reason"] = "server_error"
     return err, 500
+
+
+class CompiledModel(Model):
+    """
+    flask-restx Model that builds its JSON Schema validator once.
+
+    Model.validate() regenerates the schema dict and a Draft4Validator on
+    every request. Input models never change after import, so the
+    validator is kept and only rebuilt if the resolver or format checker
+    handed in by the Api changes.
+    """
+
+    _validator = None
+    _validator_key = None
+
+    def validate(self, data, resolver=None, format_checker=None):
+        key = (resolver, format_checker)
+        if self._validator is None or self._validator_key != key:
+            self._validator = Draft4Validator(
+                self.__schema__, resolver=resolver, format_checker=format_checker
+            )
+            self._validator_key = key
+        try:
+            self._validator.validate(data)
+        except ValidationError:
+            abort(
+                HTTPStatus.BAD_REQUEST,
+                message="Input payload validation failed",
+                errors=dict(
+                    self.format_error(e) for e in self._validator.iter_errors(data)
+                ),
+            )
+
+
+def compiled_model(api, name, model, mask=None, strict=False, **kwargs):
+    """Register a CompiledModel on a namespace; same arguments as api.model()."""
+    compiled = CompiledModel(name, model, mask=mask, strict=strict)
+    compiled.__apidoc__.update(kwargs)
+    return api.add_model(name, compiled)
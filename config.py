@@ -25,6 +25,16 @@ class Config:
     PASSWORD_RESET_TOKEN_MAX_AGE_SECONDS = os.environ.get(
         "PASSWORD_RESET_TOKEN_MAX_AGE_SECONDS", 3600
     )  # Example: 1 hour
+    GROUP_CACHE_TTL_SECONDS = int(
+        os.environ.get("GROUP_CACHE_TTL_SECONDS", 60)
+    )  # Example: 1 min
+    # Argon2id password hashing (OWASP profile). Keep these identical on every
+    # worker; `flask calibrate-argon2` suggests a time_cost for this host.
+    ARGON2_TIME_COST = int(os.environ.get("ARGON2_TIME_COST", 2))
+    ARGON2_MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", 19456))  # KiB
+    ARGON2_PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", 1))
+    ARGON2_HASH_LEN = int(os.environ.get("ARGON2_HASH_LEN", 32))  # bytes
+    ARGON2_SALT_LEN = int(os.environ.get("ARGON2_SALT_LEN", 16))  # bytes
     FRONTEND_BASE_URL = os.environ.get("FRONTEND_BASE_URL", "http://localhost:3000")
 
     # mailjet api keys
@@ -67,6 +77,13 @@ class ProductionConfig(Config):
         "DATABASE_URL", "sqlite:///" + os.path.join(basedir, "data.sqlite")
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Keep warm connections per worker instead of reconnecting per request
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 20)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_pre_ping": True,  # Replace connections the server closed while idle
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE_SECONDS", 1800)),
+    }
 
 
 config_by_name = dict(
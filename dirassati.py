@@ -50,6 +50,23 @@ def make_shell_context():
     return dict(db=db, config=config)
 
 
+@app.cli.command("calibrate-argon2")
+@click.option("--target-ms", default=500, show_default=True, help="Target hash time.")
+def calibrate_argon2(target_ms):
+    """Suggest an ARGON2_TIME_COST for this host (report only)"""
+    from app.hashing import calibrate_time_cost
+
+    time_cost = calibrate_time_cost(
+        target_ms, config["ARGON2_MEMORY_COST"], config["ARGON2_PARALLELISM"]
+    )
+    click.echo(
+        f"ARGON2_TIME_COST={time_cost} reaches ~{target_ms}ms "
+        f"(memory_cost={config['ARGON2_MEMORY_COST']}, "
+        f"parallelism={config['ARGON2_PARALLELISM']}). "
+        f"Currently configured: {config['ARGON2_TIME_COST']}."
+    )
+
+
 @app.cli.command()
 @click.argument("test_names", nargs=-1)
 def test(test_names):
@@ -1,4 +1,13 @@
 import json
+from unittest.mock import patch
+
+from flask_jwt_extended import create_refresh_token
+
+from app import db
+from app.auth.service import OTP_PENDING_PLACEHOLDER
+from app.extensions import redis_client
+from app.hashing import ARGON2_PREFIX, hash_password
+from app.models import Parent
 
 from tests.utils.base import BaseTestCase
 from tests.utils.common import register_user, login_user
@@ -29,3 +38,82 @@ class TestAuthBlueprint(BaseTestCase):
         self.assertEqual(login_resp.status_code, 200)
         self.assertTrue(login_resp.status)
         self.assertEqual(login_data["user"]["email"], data["email"])
+
+
+class TestRegisterOtpClaim(BaseTestCase):
+    data = dict(
+        email="otp@parent.com",
+        password="correct-horse",
+        role="parent",
+        phone_number="+1234567890",
+        first_name="Jane",
+        last_name="Doe",
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.redis_key = f"otp:register:{self.data['email']}"
+        redis_client.delete(self.redis_key)
+        # Keep the tests off Mailjet
+        email_patcher = patch("app.auth.service.send_email_async")
+        email_patcher.start()
+        self.addCleanup(email_patcher.stop)
+
+    def tearDown(self):
+        redis_client.delete(self.redis_key)
+        super().tearDown()
+
+    def test_register_stores_otp_payload(self):
+        """ The claimed key ends up holding the hashed registration data """
+        resp = self.client.post("/auth/register", json=self.data)
+
+        self.assertEqual(resp.status_code, 201)
+        user_info, otp, role = json.loads(redis_client.get(self.redis_key))
+        self.assertTrue(user_info["password_hash"].startswith(ARGON2_PREFIX))
+        self.assertEqual(len(otp), 6)
+        self.assertEqual(role, "parent")
+        self.assertGreater(redis_client.ttl(self.redis_key), 0)
+
+    def test_pending_otp_rejected_without_hashing(self):
+        """ A second registration while an OTP is pending gets a 429 and no hash """
+        self.client.post("/auth/register", json=self.data)
+
+        with patch("app.auth.service.hash_password") as hash_mock:
+            resp = self.client.post("/auth/register", json=self.data)
+
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp.get_json()["error_reason"], "otp_exists")
+        hash_mock.assert_not_called()
+
+    def test_verify_otp_rejects_placeholder(self):
+        """ A claimed key whose OTP isn't issued yet never verifies """
+        redis_client.set(self.redis_key, OTP_PENDING_PLACEHOLDER)
+
+        resp = self.client.post(
+            "/auth/verify-otp", json=dict(email=self.data["email"], otp="123456")
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error_reason"], "otp_invalid_or_expired")
+
+
+class TestAuthRefresh(BaseTestCase):
+    def test_refresh_reads_identity_and_role(self):
+        """ The refresh token's sub and role claims select the user """
+        parent = Parent(
+            email="refresh@parent.com",
+            password=hash_password("correct-horse"),
+            phone_number="+1234567890",
+        )
+        db.session.add(parent)
+        db.session.commit()
+        refresh_token = create_refresh_token(
+            identity=str(parent.id), additional_claims={"role": "parent"}
+        )
+
+        resp = self.client.post(
+            "/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"}
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("access_token", resp.get_json())
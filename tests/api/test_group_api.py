@@ -0,0 +1,251 @@
+from unittest.mock import patch
+
+from flask_jwt_extended import create_access_token
+from redis.exceptions import RedisError
+
+from app import db
+from app.extensions import redis_client
+from app.models import Group, Level
+from app.api.groups.service import GroupService
+
+from tests.utils.base import BaseTestCase
+from tests.utils.common import count_queries
+
+
+def auth_headers(role):
+    access_token = create_access_token(identity="1", additional_claims={"role": role})
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+class TestGroupQueryCount(BaseTestCase):
+    """ Pin the number of SQL statements per group endpoint to catch N+1 regressions """
+
+    def setUp(self):
+        super().setUp()
+        level = Level(name="Level 1")
+        db.session.add(level)
+        db.session.flush()
+        self.groups = [Group(name=f"Group {i}", level_id=level.id) for i in range(5)]
+        db.session.add_all(self.groups)
+        db.session.commit()
+        for group in self.groups:
+            redis_client.delete(f"group:json:{group.id}")
+
+    def test_list_groups_is_one_query(self):
+        """ The list endpoint fetches every group in a single SELECT """
+        with count_queries(db.engine) as statements:
+            resp = self.client.get("/api/groups/", headers=auth_headers("admin"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()["groups"]), len(self.groups))
+        self.assertEqual(len(statements), 1)
+
+    def test_get_group_hits_db_once_then_cache(self):
+        """ A single group is read once, then served from the cache """
+        group_id = self.groups[0].id
+        # Start from a fresh session so the identity map can't hide the SELECT
+        db.session.expire_all()
+
+        with count_queries(db.engine) as statements:
+            resp = self.client.get(f"/api/groups/{group_id}", headers=auth_headers("parent"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(statements), 1)
+
+        with count_queries(db.engine) as statements:
+            resp = self.client.get(f"/api/groups/{group_id}", headers=auth_headers("parent"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(statements), 0)
+
+    def update_statements(self, data):
+        """ PUT data to the first group; return the UPDATE statements it issued """
+        group_id = self.groups[0].id
+        with count_queries(db.engine) as statements:
+            resp = self.client.put(
+                f"/api/groups/{group_id}", json=data, headers=auth_headers("admin")
+            )
+        self.assertEqual(resp.status_code, 200)
+        return [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+
+    def test_no_op_update_issues_no_update(self):
+        """ Re-sending the stored values doesn't write """
+        group = self.groups[0]
+        updates = self.update_statements({"name": group.name, "level_id": group.level_id})
+        self.assertEqual(len(updates), 0)
+
+    def test_changed_update_issues_one_update(self):
+        """ A changed field is written with a single UPDATE """
+        updates = self.update_statements({"name": "Renamed"})
+        self.assertEqual(len(updates), 1)
+
+
+class TestGroupCreate(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.level = Level(name="Level 1")
+        db.session.add(self.level)
+        db.session.commit()
+
+    def create_group(self, data):
+        return self.client.post("/api/groups/", json=data, headers=auth_headers("admin"))
+
+    def test_create_group(self):
+        """ A group is created with the validated level_id """
+        resp = self.create_group({"name": "Group A", "level_id": self.level.id})
+
+        self.assertEqual(resp.status_code, 201)
+        group_data = resp.get_json()["group"]
+        self.assertEqual(group_data["name"], "Group A")
+        self.assertEqual(group_data["level_id"], self.level.id)
+        self.assertIsNotNone(db.session.get(Group, group_data["id"]))
+
+    def test_create_group_unknown_level(self):
+        """ An unknown level_id is rejected before anything is written """
+        resp = self.create_group({"name": "Group A", "level_id": self.level.id + 1})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error_reason"], "level_404")
+        self.assertEqual(db.session.query(Group).count(), 0)
+
+    def test_create_group_rejects_id(self):
+        """ A client-sent id is a validation error, not a server error """
+        resp = self.create_group({"name": "Group A", "level_id": self.level.id, "id": 77})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error_reason"], "validation_error")
+        self.assertEqual(db.session.query(Group).count(), 0)
+
+
+class TestGroupUpdate(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.levels = [Level(name="Level 1"), Level(name="Level 2")]
+        db.session.add_all(self.levels)
+        db.session.flush()
+        self.group = Group(name="Group A", level_id=self.levels[0].id)
+        db.session.add(self.group)
+        db.session.commit()
+        redis_client.delete(f"group:json:{self.group.id}")
+
+    def update_group(self, data):
+        return self.client.put(
+            f"/api/groups/{self.group.id}", json=data, headers=auth_headers("admin")
+        )
+
+    def test_update_level_only(self):
+        """ level_id alone is a valid update """
+        resp = self.update_group({"level_id": self.levels[1].id})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["group"]["level_id"], self.levels[1].id)
+
+    def test_update_without_updatable_fields(self):
+        """ A body with no updatable field is rejected """
+        resp = self.update_group({})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error_reason"], "empty_update_data")
+
+    def test_update_non_object_body(self):
+        """ A non-object body is a validation error, not a crash """
+        resp, status = GroupService.update_group(self.group.id, ["name"])
+
+        self.assertEqual(status, 400)
+        self.assertEqual(resp["error_reason"], "validation_error")
+
+    def test_update_changes_group(self):
+        """ A changed name is written and returned """
+        resp = self.update_group({"name": "Group B"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["group"]["name"], "Group B")
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Group, self.group.id).name, "Group B")
+
+    def test_update_no_op(self):
+        """ Re-sending the stored values succeeds and leaves the group as is """
+        resp = self.update_group({"name": "Group A", "level_id": self.levels[0].id})
+
+        self.assertEqual(resp.status_code, 200)
+        group_data = resp.get_json()["group"]
+        self.assertEqual(group_data["name"], "Group A")
+        self.assertEqual(group_data["level_id"], self.levels[0].id)
+
+    def test_update_rejects_id(self):
+        """ A client-sent id is rejected and the primary key is left alone """
+        resp = self.update_group({"name": "Group B", "id": 999})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error_reason"], "validation_error")
+        db.session.expire_all()
+        self.assertIsNone(db.session.get(Group, 999))
+        self.assertEqual(db.session.get(Group, self.group.id).name, "Group A")
+
+    def test_update_unknown_level(self):
+        """ An unknown level_id is rejected and nothing is written """
+        resp = self.update_group({"name": "Group B", "level_id": self.levels[1].id + 1})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.get_json()["error_reason"], "level_404")
+        db.session.expire_all()
+        group = db.session.get(Group, self.group.id)
+        self.assertEqual(group.name, "Group A")
+        self.assertEqual(group.level_id, self.levels[0].id)
+
+
+class TestGroupCacheInvalidation(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        level = Level(name="Level 1")
+        db.session.add(level)
+        db.session.flush()
+        self.group = Group(name="Group A", level_id=level.id)
+        db.session.add(self.group)
+        db.session.commit()
+        self.cache_key = f"group:json:{self.group.id}"
+        GroupService.get_group_data(self.group.id)  # Fill the cache
+        self.addCleanup(redis_client.delete, self.cache_key)
+
+    def test_eviction_waits_for_commit(self):
+        """ A flushed but uncommitted change keeps the cache; the commit evicts it """
+        self.group.name = "Group B"
+        db.session.flush()
+        self.assertIsNotNone(redis_client.get(self.cache_key))
+
+        db.session.commit()
+        self.assertIsNone(redis_client.get(self.cache_key))
+
+    def test_primary_key_change_evicts_old_key(self):
+        """ Changing the id through the ORM still evicts the committed id's entry """
+        self.group.id = 999
+        db.session.commit()
+        self.addCleanup(redis_client.delete, "group:json:999")
+
+        self.assertIsNone(redis_client.get(self.cache_key))
+
+    def test_delete_evicts(self):
+        """ Deleting a group evicts its cached payload """
+        resp = self.client.delete(f"/api/groups/{self.group.id}", headers=auth_headers("admin"))
+
+        self.assertEqual(resp.status_code, 204)
+        self.assertIsNone(redis_client.get(self.cache_key))
+
+
+class TestGroupGetWithoutCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        level = Level(name="Level 1")
+        db.session.add(level)
+        db.session.flush()
+        self.group = Group(name="Group A", level_id=level.id)
+        db.session.add(self.group)
+        db.session.commit()
+
+    def test_get_group_when_redis_is_down(self):
+        """ A Redis outage falls back to the DB instead of failing the read """
+        with patch.object(redis_client, "get", side_effect=RedisError), patch.object(
+            redis_client, "set", side_effect=RedisError
+        ):
+            resp, status = GroupService.get_group_data(self.group.id)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(resp["group"]["name"], "Group A")
@@ -0,0 +1,62 @@
+import json
+
+from werkzeug.security import generate_password_hash
+
+from app import db, hashing
+from app.hashing import (
+    ARGON2_PREFIX,
+    check_password,
+    hash_password,
+    password_needs_rehash,
+)
+from app.models import Parent
+
+from tests.utils.base import BaseTestCase
+
+
+class TestPasswordHashing(BaseTestCase):
+    def test_argon2_hash_round_trips(self):
+        """ A new hash is Argon2id, verifies and needs no rehash """
+        password_hash = hash_password("correct-horse")
+
+        self.assertTrue(password_hash.startswith(ARGON2_PREFIX))
+        self.assertTrue(check_password(password_hash, "correct-horse"))
+        self.assertFalse(check_password(password_hash, "wrong-horse"))
+        self.assertFalse(password_needs_rehash(password_hash))
+
+    def test_legacy_werkzeug_hash_still_verifies(self):
+        """ Hashes created before the switch keep working but are flagged for rehash """
+        legacy_hash = generate_password_hash("correct-horse")
+
+        self.assertTrue(check_password(legacy_hash, "correct-horse"))
+        self.assertFalse(check_password(legacy_hash, "wrong-horse"))
+        self.assertTrue(password_needs_rehash(legacy_hash))
+
+    def test_login_rehashes_legacy_password(self):
+        """ A successful login upgrades a legacy hash to Argon2id """
+        parent = Parent(
+            email="legacy@parent.com",
+            password=generate_password_hash("correct-horse"),
+            phone_number="+1234567890",
+        )
+        db.session.add(parent)
+        db.session.commit()
+
+        login_resp = self.client.post(
+            "/auth/login",
+            data=json.dumps(
+                dict(email=parent.email, password="correct-horse", role="parent")
+            ),
+            content_type="application/json",
+        )
+
+        self.assertEqual(login_resp.status_code, 200)
+        db.session.refresh(parent)
+        self.assertTrue(parent.password.startswith(ARGON2_PREFIX))
+        self.assertTrue(parent.verify_password("correct-horse"))
+
+    def test_hasher_uses_pinned_time_cost(self):
+        """ init_app builds the hasher from ARGON2_TIME_COST without calibrating """
+        self.assertEqual(
+            hashing.password_hasher.time_cost, self.app.config["ARGON2_TIME_COST"]
+        )
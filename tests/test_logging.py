@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import app as app_module
+from app import create_app
+
+
+class TestLogListener(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app("testing")
+        # Each test starts from a process without a listener, like a fresh worker
+        app_module._stop_log_listener()
+        app_module._reset_logging_after_fork()
+        self.addCleanup(app_module._reset_logging_after_fork)
+        self.addCleanup(app_module._stop_log_listener)
+
+    def test_listener_starts_on_first_record(self):
+        """ create_app() starts no thread; the first record does """
+        self.assertIsNone(app_module._log_listener)
+
+        with patch("sys.stdout", new_callable=io.StringIO) as stdout:
+            self.app.logger.warning("first record")
+            self.assertIsNotNone(app_module._log_listener)
+            app_module._stop_log_listener()
+
+        self.assertIn("first record", stdout.getvalue())
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs os.fork")
+    def test_forked_worker_logs(self):
+        """ A worker forked after the parent started its listener still gets its logs out """
+        with patch("sys.stdout", new_callable=io.StringIO):
+            self.app.logger.warning("parent record")
+
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # Child: log through the inherited handler, then report via the pipe
+            os.close(read_fd)
+            status = 1
+            try:
+                sys.stdout = os.fdopen(write_fd, "w")
+                self.app.logger.warning("worker record")
+                app_module._stop_log_listener()
+                sys.stdout.flush()
+                status = 0
+            finally:
+                os._exit(status)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as child_output:
+            output = child_output.read()
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertIn("worker record", output)
+        self.assertNotIn("parent record", output)
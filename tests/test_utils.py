@@ -0,0 +1,35 @@
+import unittest
+
+from flask_restx import Namespace, fields
+from werkzeug.exceptions import BadRequest
+
+from app.utils import CompiledModel, compiled_model
+
+
+class TestCompiledModel(unittest.TestCase):
+    def setUp(self):
+        self.api = Namespace("test")
+
+    def test_accepts_model_options(self):
+        """ mask and strict are forwarded like api.model() does """
+        model = compiled_model(
+            self.api,
+            "Strict",
+            {"name": fields.String(required=True)},
+            mask="name",
+            strict=True,
+        )
+
+        self.assertIsInstance(model, CompiledModel)
+        self.assertEqual(str(model.__mask__), "{name}")
+        self.assertFalse(model.__schema__["additionalProperties"])
+        model.validate({"name": "A"})
+        with self.assertRaises(BadRequest):
+            model.validate({"name": "A", "extra": 1})
+
+    def test_defaults_match_api_model(self):
+        """ Without options the model is as lenient as api.model() """
+        model = compiled_model(self.api, "Lenient", {"name": fields.String()})
+
+        self.assertNotIn("additionalProperties", model.__schema__)
+        model.validate({"name": "A", "extra": 1})
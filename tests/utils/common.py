@@ -1,5 +1,8 @@
 # Commonly used test case functions.
 import json
+from contextlib import contextmanager
+
+from sqlalchemy import event
 
 
 def register_user(self, data):
@@ -14,3 +17,18 @@ def login_user(self, email, password):
         data=json.dumps(dict(email=email, password=password,)),
         content_type="application/json",
     )
+
+
+@contextmanager
+def count_queries(engine):
+    """ Collect every SQL statement executed on engine inside the block """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)